@@ -52,13 +52,13 @@ class SvVectorFieldEvaluateNode(SverchCustomTreeNode, bpy.types.Node):
                 value = field.evaluate(*vertex)
                 new_values = [tuple(value)]
             else:
-                XYZ = vertices if isinstance(vertices, np.ndarray) else np.array(vertices)
-                xs = XYZ[:,0]
-                ys = XYZ[:,1]
-                zs = XYZ[:,2]
+                XYZ = np.asarray(vertices, dtype=np.float64)
+                # contiguous coordinate arrays; columns of a row-major (N, 3) array
+                # are strided, so this copies, except for column-major (Fortran-ordered) input
+                xs, ys, zs = np.ascontiguousarray(XYZ.T)
                 new_xs, new_ys, new_zs = field.evaluate_grid(xs, ys, zs)
-                new_vectors = np.dstack((new_xs[:], new_ys[:], new_zs[:]))
-                new_values = new_vectors if self.output_numpy else new_vectors[0].tolist()
+                new_vectors = np.stack((new_xs, new_ys, new_zs), axis=-1)
+                new_values = new_vectors if self.output_numpy else new_vectors.tolist()
 
             values_out.append(new_values)
 
@@ -193,7 +193,7 @@ class SvDuplicateAlongEdgeNode(ModifierNode, SverchCustomTreeNode, bpy.types.Nod
 
         need_flip = False
         if self.algorithm == 'householder':
-            rot = autorotate_householder(x, direction).inverted()
+            rot = autorotate_householder(x, direction).transposed()
             # Since Householder transformation is reflection, we need to reflect things back
             need_flip = True
         elif self.algorithm == 'track':
@@ -5,17 +5,21 @@
 # SPDX-License-Identifier: GPL3
 # License-Filename: LICENSE
 
-from typing import List, Dict
+from itertools import chain
+from typing import List
+
+import numpy as np
 
 import bpy
 from bmesh.ops import split_edges
 
+from sverchok.dependencies import numba
 from sverchok.nodes.list_masks.mask_convert import mask_converter_node
 from sverchok.node_tree import SverchCustomTreeNode
 from sverchok.data_structure import updateNode, fixed_iter
 from sverchok.utils.sv_bmesh_utils import empty_bmesh, add_mesh_to_bmesh, pydata_from_bmesh
-from sverchok.utils.sv_mesh_utils import polygons_to_edges_np
 from sverchok.utils.nodes_mixins.sockets_config import ModifierNode
+from sverchok.utils.decorators_compilation import njit
 
 
 def split_mesh_elements_node(vertices=None,
@@ -24,15 +28,16 @@ def split_mesh_elements_node(vertices=None,
                              face_data=None,
                              mask=None,
                              mask_mode='BY_VERTEX',
-                             split_type='VERTS'):
+                             split_type='VERTS',
+                             output_numpy=False):
 
-    if not vertices:
+    if vertices is None or len(vertices) == 0:
         return [], [], [], []
 
-    edges = edges or []
-    faces = faces or []
-    face_data = list(fixed_iter(face_data, len(faces))) if face_data else None
-    mask = mask or []
+    edges = [] if edges is None else edges
+    faces = [] if faces is None else faces
+    face_data = list(fixed_iter(face_data, len(faces))) if face_data is not None and len(face_data) else None
+    mask = [] if mask is None else mask
 
     if split_type == 'VERTS':
         if mask_mode != 'BY_VERTEX':
@@ -42,7 +47,7 @@ def split_mesh_elements_node(vertices=None,
                 faces_mask=mask if mask_mode == 'BY_FACE' else None,
                 mode=mask_mode)
 
-        vs, es, fs, fds = split_by_vertices(vertices, edges, faces, mask, face_data)
+        vs, es, fs, fds = split_by_vertices(vertices, edges, faces, mask, face_data, output_numpy)
     elif split_type == 'EDGES':
 
         if mask_mode != 'BY_EDGE':
@@ -63,36 +68,89 @@ def split_by_vertices(verts,
                       edges=None,
                       faces=None,
                       selected_verts: List[bool] = None,
-                      face_data=None):
-    """it ignores edges for now"""
-    edges = edges or []
-    faces = faces or []
-    if not selected_verts:
+                      face_data=None,
+                      output_numpy=False):
+    """it ignores edges for now, output edges are generated from faces"""
+    edges = [] if edges is None else edges
+    faces = [] if faces is None else faces
+    if selected_verts is None or len(selected_verts) == 0:
         selected_verts = [True] * len(verts)
     elif len(selected_verts) != len(verts):
         selected_verts = list(fixed_iter(selected_verts, len(verts)))
 
-    out_verts = []
-    out_faces = []
-    old_new_verts: Dict[int, int] = dict()
-    for face in faces:
-        new_face = []
-        for i in face:
-            if selected_verts[i]:
-                out_verts.append(verts[i])
-                new_face.append(len(out_verts) - 1)
-            else:
-                if i in old_new_verts:
-                    new_face.append(old_new_verts[i])
-                else:
-                    out_verts.append(verts[i])
-                    old_new_verts[i] = len(out_verts) - 1
-                    new_face.append(len(out_verts) - 1)
-        out_faces.append(new_face)
-    out_edges = polygons_to_edges_np([out_faces], unique_edges=True)[0]
+    if len(faces) == 0:
+        return [], [], [], face_data
+
+    face_lengths = np.fromiter(map(len, faces), dtype=np.int32, count=len(faces))
+    face_offsets = np.cumsum(face_lengths)
+    face_verts = np.fromiter(chain.from_iterable(faces), dtype=np.int32, count=face_offsets[-1])
+    selected = np.asarray(selected_verts, dtype=bool)
+    remap = remap_split_verts if numba else remap_split_verts_np
+    new_face_verts, old_v_indexes = remap(face_verts, selected, len(verts))
+
+    # each corner makes an edge with the next corner of the same face,
+    # edges are deduplicated by packing sorted index pairs into int64 keys
+    n_out = len(old_v_indexes)
+    next_corners = np.arange(1, len(face_verts) + 1)
+    next_corners[face_offsets - 1] = face_offsets - face_lengths
+    edge_a = np.minimum(new_face_verts, new_face_verts[next_corners]).astype(np.int64)
+    edge_b = np.maximum(new_face_verts, new_face_verts[next_corners]).astype(np.int64)
+    edge_keys = np.unique(edge_a * n_out + edge_b)
+    out_edges = np.stack((edge_keys // n_out, edge_keys % n_out), axis=-1)
+
+    # a single gather allocates exactly as many vertices as needed
+    out_verts = np.asarray(verts, dtype=np.float64)[old_v_indexes]
+    if output_numpy and (face_lengths == face_lengths[0]).all():
+        out_faces = new_face_verts.reshape((-1, face_lengths[0]))
+    else:
+        new_face_verts = new_face_verts.tolist()
+        out_faces = [new_face_verts[start: end] for start, end in zip(chain([0], face_offsets), face_offsets)]
+    if not output_numpy:
+        out_verts = out_verts.tolist()
+        out_edges = out_edges.tolist()
     return out_verts, out_edges, out_faces, face_data
 
 
+def remap_split_verts_np(face_verts, selected, n_verts):
+    """
+    face_verts: flat array of vertex indexes of all faces
+    selected: boolean array with the selection state of each vertex
+    returns new vertex indexes of face corners and old indexes of new vertices
+    """
+    is_selected = selected[face_verts]
+
+    # each face corner of a selected vertex produces a new vertex,
+    # unselected vertices produce a new vertex only at their first occurrence
+    _, first_occurrence = np.unique(face_verts, return_index=True)
+    is_new = is_selected.copy()
+    is_new[first_occurrence] = True
+    new_indexes = np.cumsum(is_new) - 1
+    shared_indexes = np.empty(n_verts, dtype=new_indexes.dtype)
+    shared_indexes[face_verts[first_occurrence]] = new_indexes[first_occurrence]
+    new_face_verts = np.where(is_selected, new_indexes, shared_indexes[face_verts])
+    return new_face_verts, face_verts[is_new]
+
+
+@njit(cache=True)
+def remap_split_verts(face_verts, selected, n_verts):
+    """The same as remap_split_verts_np but in a single pass without sorting"""
+    new_face_verts = np.empty_like(face_verts)
+    old_v_indexes = np.empty_like(face_verts)
+    shared_indexes = np.full(n_verts, -1, dtype=face_verts.dtype)
+    n_new = 0
+    for corner in range(len(face_verts)):
+        i = face_verts[corner]
+        if not selected[i] and shared_indexes[i] != -1:
+            new_face_verts[corner] = shared_indexes[i]
+            continue
+        if not selected[i]:
+            shared_indexes[i] = n_new
+        old_v_indexes[n_new] = i
+        new_face_verts[corner] = n_new
+        n_new += 1
+    return new_face_verts, old_v_indexes[:n_new]
+
+
 def split_by_edges(verts, edges=None, faces=None, face_data=None, selected_edges: List[bool] = None):
     with empty_bmesh() as bm:
         add_mesh_to_bmesh(bm, verts, edges, faces, 'initial_index')
@@ -121,9 +179,22 @@ class SvSplitMeshElements(ModifierNode, SverchCustomTreeNode, bpy.types.Node):
     mask_mode: bpy.props.EnumProperty(items=select_mode_items, update=updateNode)
     split_type: bpy.props.EnumProperty(items=[(i.upper(), i, '') for i in ['verts', 'edges']], update=updateNode)
 
+    output_numpy: bpy.props.BoolProperty(
+        name='Output NumPy',
+        description='Output NumPy arrays (improves performance)',
+        default=False,
+        update=updateNode)
+
     def draw_buttons(self, context, layout):
         layout.prop(self, 'split_type', expand=True)
 
+    def draw_buttons_ext(self, context, layout):
+        self.draw_buttons(context, layout)
+        layout.prop(self, 'output_numpy')
+
+    def rclick_menu(self, context, layout):
+        layout.prop(self, 'output_numpy')
+
     def draw_mask_socket(self, socket, context, layout):
         row = layout.row()
         text = f'. {socket.objects_number}' if socket.objects_number else ""
@@ -153,7 +224,8 @@ class SvSplitMeshElements(ModifierNode, SverchCustomTreeNode, bpy.types.Node):
         obj_n = max(map(len, data))
         iter_data = zip(*[fixed_iter(d, obj_n, None) for d in data])
         for v, e, f, fd, m in iter_data:
-            out.append(split_mesh_elements_node(v, e, f, fd, m, self.mask_mode, self.split_type))
+            out.append(split_mesh_elements_node(v, e, f, fd, m, self.mask_mode, self.split_type,
+                                                self.output_numpy))
 
         vs, es, fs, fds = list(zip(*out)) if out else ([], [], [], [])
         self.outputs['Vertices'].sv_set(vs)
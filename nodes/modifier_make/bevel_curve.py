@@ -6,20 +6,72 @@
 # License-Filename: LICENSE
 
 
-from mathutils import Vector, Matrix
+from mathutils import Vector
 import numpy as np
 
 import bpy
-import bmesh
 from bpy.props import IntProperty, EnumProperty, BoolProperty, FloatProperty
 
+from sverchok.dependencies import numba
 from sverchok.node_tree import SverchCustomTreeNode
 from sverchok.data_structure import updateNode, match_long_repeat, ensure_nesting_level
-from sverchok.utils.geom import autorotate_householder, autorotate_track, autorotate_diff
+from sverchok.utils.geom import autorotate_track, autorotate_diff
 from sverchok.utils.geom import LinearSpline, CubicSpline
-from sverchok.utils.sv_bmesh_utils import pydata_from_bmesh
-from sverchok.utils.sv_mesh_utils import polygons_to_edges
+from sverchok.utils.sv_mesh_utils import polygons_to_edges, polygons_to_edges_np
 from sverchok.utils.nodes_mixins.sockets_config import ModifierNode
+from sverchok.utils.decorators_compilation import njit
+
+prange = numba.prange if numba else range
+
+
+@njit(parallel=True, cache=True)
+def bevel_householder_matrices(idx1, tangents, twist_values, taper_values):
+    """
+    Fused version of SvBevelCurveNode.get_matrices for Householder algorithm:
+    computes rotation @ scale @ twist for each step with scalar arithmetic only.
+    """
+    n = len(tangents)
+    # (a, b) is the twist rotation plane, as in get_matrices
+    a = (idx1 + 1) % 3
+    b = (idx1 + 2) % 3
+    matrices = np.empty((n, 3, 3))
+    for i in prange(n):
+        t1, ta, tb = tangents[i, idx1], tangents[i, a], tangents[i, b]
+        # Householder vector, in components along idx1, a, b
+        u1 = t1 + np.sqrt(t1 * t1 + ta * ta + tb * tb)
+        ua, ub = ta, tb
+        norm = np.sqrt(u1 * u1 + ua * ua + ub * ub)
+        if norm > 0:
+            u1 /= norm
+            ua /= norm
+            ub /= norm
+        else:
+            u1 = ua = ub = 0.0
+
+        # taper_values hold scales along the lesser and the greater of the other two axes
+        if idx1 == 1:
+            scale_a, scale_b = taper_values[i, 1], taper_values[i, 0]
+        else:
+            scale_a, scale_b = taper_values[i, 0], taper_values[i, 1]
+        cos = np.cos(twist_values[i])
+        sin = np.sin(twist_values[i])
+        # columns a and b of scale @ twist; column idx1 is the unit vector
+        aa, ba = scale_a * cos, scale_b * sin
+        ab, bb = -scale_a * sin, scale_b * cos
+
+        # reflection @ v = v - 2 * u * (u . v)
+        dot_a = ua * aa + ub * ba
+        dot_b = ua * ab + ub * bb
+        matrices[i, idx1, idx1] = 1.0 - 2.0 * u1 * u1
+        matrices[i, a, idx1] = -2.0 * ua * u1
+        matrices[i, b, idx1] = -2.0 * ub * u1
+        matrices[i, idx1, a] = -2.0 * u1 * dot_a
+        matrices[i, a, a] = aa - 2.0 * ua * dot_a
+        matrices[i, b, a] = ba - 2.0 * ub * dot_a
+        matrices[i, idx1, b] = -2.0 * u1 * dot_b
+        matrices[i, a, b] = ab - 2.0 * ua * dot_b
+        matrices[i, b, b] = bb - 2.0 * ub * dot_b
+    return matrices
 
 
 class SvBevelCurveNode(ModifierNode, SverchCustomTreeNode, bpy.types.Node):
@@ -138,6 +190,11 @@ class SvBevelCurveNode(ModifierNode, SverchCustomTreeNode, bpy.types.Node):
         default = False,
         update=updateNode)
 
+    # node_id -> {key: spline} with taper and twist splines
+    # built during the last process() call, for most recently updated nodes
+    splines_cache = {}
+    max_cached_nodes = 64
+
     def sv_init(self, context):
         self.inputs.new('SvVerticesSocket', "Curve")
         self.inputs.new('SvVerticesSocket', 'BevelVerts')
@@ -202,6 +259,16 @@ class SvBevelCurveNode(ModifierNode, SverchCustomTreeNode, bpy.types.Node):
             spline = CubicSpline(path, metric = metric, is_cyclic = is_cyclic)
         return spline
 
+    def get_spline(self, old_cache, cache, key, make_spline, data):
+        # Only NumPy input is cached: a key for nested lists would take
+        # as much Python work to build as the spline itself.
+        if not isinstance(data, np.ndarray):
+            return make_spline(data)
+        key = key + (data.shape, data.dtype.str, data.tobytes())
+        if key not in cache:
+            cache[key] = old_cache[key] if key in old_cache else make_spline(data)
+        return cache[key]
+
     def make_taper_spline(self, vertices):
         if self.taper_metric == 'SAME':
             metric = self.metric
@@ -236,126 +303,147 @@ class SvBevelCurveNode(ModifierNode, SverchCustomTreeNode, bpy.types.Node):
             vertices = [Vector((twist, 0, t)) for t, twist in zip(ts, data)]
             return self.build_spline(vertices, self.twist_mode, is_cyclic=self.is_cyclic, metric = self.metric)
 
-    def get_matrix(self, tangent, twist_value, scale_x, scale_y):
-        x = Vector((1.0, 0.0, 0.0))
-        y = Vector((0.0, 1.0, 0.0))
-        z = Vector((0.0, 0.0, 1.0))
-
-        if self.orient_axis_idx == 0:
-            ax1, ax2, ax3 = x, y, z
-        elif self.orient_axis_idx == 1:
-            ax1, ax2, ax3 = y, x, z
-        else:
-            ax1, ax2, ax3 = z, x, y
-
-        scale_matrix = Matrix.Scale(1, 4, ax1) @ Matrix.Scale(scale_x, 4, ax2) @ Matrix.Scale(scale_y, 4, ax3)
-
-        twist_matrix = Matrix.Rotation(twist_value, 4, ax1)
+    def get_matrices(self, tangents, twist_values, taper_values):
+        """
+        Calculate rotation, scale and twist matrices for all steps at once.
+
+        tangents: np.array of shape (n, 3).
+        twist_values: np.array of shape (n,).
+        taper_values: np.array of shape (n, 2).
+        returns np.array of shape (n, 3, 3).
+        """
+        n = len(tangents)
+        idx1 = self.orient_axis_idx
+        idx2, idx3 = [i for i in range(3) if i != idx1]
+
+        if self.algorithm == 'householder' and numba:
+            return bevel_householder_matrices(idx1, tangents, twist_values, taper_values)
+
+        scale_matrices = np.zeros((n, 3, 3))
+        scale_matrices[:, idx1, idx1] = 1.0
+        scale_matrices[:, idx2, idx2] = taper_values[:, 0]
+        scale_matrices[:, idx3, idx3] = taper_values[:, 1]
+
+        # Rotation around orientation axis; (a, b) is the rotation plane,
+        # ordered so that the rotation is right-handed.
+        a, b = (idx1 + 1) % 3, (idx1 + 2) % 3
+        cos, sin = np.cos(twist_values), np.sin(twist_values)
+        twist_matrices = np.zeros((n, 3, 3))
+        twist_matrices[:, idx1, idx1] = 1.0
+        twist_matrices[:, a, a] = cos
+        twist_matrices[:, a, b] = -sin
+        twist_matrices[:, b, a] = sin
+        twist_matrices[:, b, b] = cos
 
         if self.algorithm == 'householder':
-            rot = autorotate_householder(ax1, tangent).inverted()
-        elif self.algorithm == 'track':
-            rot = autorotate_track(self.orient_axis, tangent, self.up_axis)
-        elif self.algorithm == 'diff':
-            rot = autorotate_diff(tangent, ax1)
+            # Householder reflection is symmetric and orthogonal,
+            # so it is its own inverse.
+            us = np.array(tangents)
+            us[:, idx1] += np.linalg.norm(tangents, axis=1)
+            norms = np.linalg.norm(us, axis=1)
+            good = norms > 0
+            us[good] /= norms[good, np.newaxis]
+            us[~good] = 0.0
+            rotations = np.eye(3) - 2 * np.einsum('ni,nj->nij', us, us)
         else:
-            raise Exception("Unsupported algorithm")
-
-        return rot @ scale_matrix @ twist_matrix
-
-    def get_taper_scale(self, vertex):
-        projection = Vector(vertex)
+            # resolve the algorithm and node properties once, not per step
+            if self.algorithm == 'track':
+                orient_axis, up_axis = self.orient_axis, self.up_axis
+                def rotate(tangent):
+                    return autorotate_track(orient_axis, tangent, up_axis)
+            elif self.algorithm == 'diff':
+                ax1 = Vector((0.0, 0.0, 0.0))
+                ax1[idx1] = 1.0
+                def rotate(tangent):
+                    return autorotate_diff(tangent, ax1)
+            else:
+                raise Exception("Unsupported algorithm")
+            rotations = np.array([rotate(Vector(tangent)).to_3x3() for tangent in tangents])
+
+        return rotations @ scale_matrices @ twist_matrices
+
+    def get_taper_scales(self, vertices):
+        """
+        vertices: np.array of shape (n, 3).
+        returns np.array of shape (n, 2).
+        """
+        idx = self.orient_axis_idx
         if self.separate_scale:
-            return abs(projection[(self.orient_axis_idx + 1) % 3]), abs(projection[(self.orient_axis_idx - 1) % 3])
+            return np.abs(vertices[:, [(idx + 1) % 3, (idx - 1) % 3]])
         else:
-            projection[self.orient_axis_idx] = 0
-            return projection.length, projection.length
+            projection = np.array(vertices)
+            projection[:, idx] = 0
+            length = np.linalg.norm(projection, axis=1)
+            return np.stack((length, length), axis=-1)
 
-    def get_twist_value(self, vertex):
-        projection = Vector(vertex)
-        return projection.x
-    
     def make_bevel(self, curve, bevel_verts, bevel_edges, bevel_faces, taper, twist, steps):
-        spline = self.build_spline(curve, self.bevel_mode, self.is_cyclic)
-
         t_values = np.linspace(0.0, 1.0, num=int(steps))
         if self.is_cyclic:
             t_values = t_values[:-1]
-        if self.flip_curve:
-            t_for_curve = 1.0 - t_values
-        else:
-            t_for_curve = t_values
-        if self.flip_taper:
-            t_for_taper = 1.0 - t_values
-        else:
-            t_for_taper = t_values
-        if self.flip_twist:
-            t_for_twist = 1.0 - t_values
-        else:
-            t_for_twist = t_values
+        if len(t_values) == 0:
+            return [], [], []
+
+        spline = self.build_spline(curve, self.bevel_mode, self.is_cyclic)
+        t_flipped = 1.0 - t_values if (self.flip_curve or self.flip_taper or self.flip_twist) else None
+        t_for_curve = t_flipped if self.flip_curve else t_values
+        t_for_taper = t_flipped if self.flip_taper else t_values
+        t_for_twist = t_flipped if self.flip_twist else t_values
 
-        spline_vertices = [Vector(v) for v in spline.eval(t_for_curve).tolist()]
-        spline_tangents = [Vector(v) for v in spline.tangent(t_for_curve, h=self.tangent_precision).tolist()]
-        taper_values = [self.get_taper_scale(v) for v in taper.eval(t_for_taper).tolist()]
-        twist_values = [self.get_twist_value(v) for v in twist.eval(t_for_twist).tolist()]
+        spline_vertices = spline.eval(t_for_curve)
+        spline_tangents = spline.tangent(t_for_curve, h=self.tangent_precision)
+        taper_values = self.get_taper_scales(taper.eval(t_for_taper))
+        twist_values = twist.eval(t_for_twist)[:, 0]
 
         if bevel_faces:
             bevel_faces = ensure_nesting_level(bevel_faces, 2)
         if not bevel_edges and bevel_faces:
             bevel_edges = polygons_to_edges([bevel_faces], True)[0]
 
-        mesh = bmesh.new()
-        prev_level_vertices = None
-        first_level_vertices = None
-        for spline_vertex, spline_tangent, taper_value, twist_value in zip(spline_vertices, spline_tangents, taper_values, twist_values):
-            # Scaling and rotation matrix
-            scale_x, scale_y = taper_value
-            matrix = self.get_matrix(spline_tangent, twist_value, scale_x, scale_y)
-            level_vertices = []
-            for bevel_vertex in bevel_verts:
-                new_vertex = matrix @ Vector(bevel_vertex) + spline_vertex
-                level_vertices.append(mesh.verts.new(new_vertex))
-            if prev_level_vertices is not None:
-                for i,j in bevel_edges:
-                    v1 = prev_level_vertices[i]
-                    v2 = level_vertices[i]
-                    v3 = level_vertices[j]
-                    v4 = prev_level_vertices[j]
-                    mesh.faces.new([v4, v3, v2, v1])
-
-            if first_level_vertices is None:
-                first_level_vertices = level_vertices
-            prev_level_vertices = level_vertices
+        # Scaling and rotation matrices
+        matrices = self.get_matrices(spline_tangents, twist_values, taper_values)
+        bevel_verts = np.asarray(bevel_verts, dtype=np.float64).reshape((-1, 3))
+        # shape: (steps, number of bevel vertices, 3)
+        new_vertices = np.einsum('nij,vj->nvi', matrices, bevel_verts) + spline_vertices[:, np.newaxis, :]
+
+        n_steps, n_bevel = new_vertices.shape[:2]
+        out_vertices = new_vertices.reshape((-1, 3))
 
+        bevel_edges = np.asarray(bevel_edges, dtype=np.int32).reshape((-1, 2))
+        i, j = bevel_edges[:, 0], bevel_edges[:, 1]
+        # index of the first vertex of each level, except the last one
+        starts = (np.arange(n_steps - 1, dtype=np.int32) * n_bevel)[:, np.newaxis]
+        side_faces = np.stack((starts + j, starts + n_bevel + j, starts + n_bevel + i, starts + i), axis=-1)
+        side_faces = side_faces.reshape((-1, 4))
+
+        cap_faces = []
+        last = (n_steps - 1) * n_bevel
         if not self.is_cyclic:
             if self.cap_start:
                 if not bevel_faces:
-                    mesh.faces.new(list(reversed(first_level_vertices)))
+                    cap_faces.append(list(reversed(range(n_bevel))))
                 else:
-                    for face in bevel_faces:
-                        cap = [first_level_vertices[i] for i in reversed(face)]
-                        mesh.faces.new(cap)
-            if self.cap_end and prev_level_vertices is not None:
+                    cap_faces.extend([list(reversed(face)) for face in bevel_faces])
+            if self.cap_end:
                 if not bevel_faces:
-                    mesh.faces.new(prev_level_vertices)
+                    cap_faces.append(list(range(last, last + n_bevel)))
                 else:
-                    for face in bevel_faces:
-                        cap = [prev_level_vertices[i] for i in face]
-                        mesh.faces.new(cap)
+                    cap_faces.extend([[last + k for k in face] for face in bevel_faces])
+        elif n_steps > 1:
+            closing_faces = np.stack((i, last + i, last + j, j), axis=-1)
+            side_faces = np.concatenate((side_faces, closing_faces))
+
+        edges = []
+        if len(side_faces):
+            edges.append(polygons_to_edges_np([side_faces], unique_edges=True, output_numpy=True)[0])
+        if cap_faces:
+            edges.append(np.array(polygons_to_edges([cap_faces], unique_edges=True)[0]).reshape((-1, 2)))
+        if edges:
+            out_edges = np.unique(np.sort(np.concatenate(edges), axis=1), axis=0).tolist()
         else:
-            for i,j in bevel_edges:
-                v1 = first_level_vertices[i]
-                v2 = prev_level_vertices[i]
-                v3 = prev_level_vertices[j]
-                v4 = first_level_vertices[j]
-                mesh.faces.new([v1, v2, v3, v4])
-
-        mesh.verts.index_update()
-        mesh.verts.ensure_lookup_table()
-        mesh.faces.index_update()
-        mesh.edges.index_update()
+            out_edges = []
 
-        return mesh
+        out_faces = side_faces.tolist() + cap_faces
+        return out_vertices.tolist(), out_edges, out_faces
 
     def process(self):
         if not any(o.is_linked for o in self.outputs):
@@ -374,22 +462,37 @@ class SvBevelCurveNode(ModifierNode, SverchCustomTreeNode, bpy.types.Node):
 
         inputs = match_long_repeat([curves_s, bevel_verts_s, bevel_edges_s, bevel_faces_s, taper_verts_s, twist_data_s, steps_s])
 
+        # splines depend on these properties as well as on input data
+        taper_key = ('TAPER', self.taper_mode, self.taper_metric, self.metric, self.orient_axis)
+        twist_key = ('TWIST', self.twist_mode, self.metric, self.is_cyclic)
+        old_cache = self.splines_cache.get(self.node_id, {})
+        cache = dict()
+
         out_vertices = []
         out_edges = []
         out_faces = []
         for curve, bevel_verts, bevel_edges, bevel_faces, taper_verts, twist_data, steps in zip(*inputs):
-            taper = self.make_taper_spline(taper_verts)
-            twist = self.make_twist_spline(twist_data)
-            mesh = self.make_bevel(curve, bevel_verts, bevel_edges, bevel_faces, taper, twist, steps)
-            new_verts, new_edges, new_faces = pydata_from_bmesh(mesh)
+            taper = self.get_spline(old_cache, cache, taper_key, self.make_taper_spline, taper_verts)
+            twist = self.get_spline(old_cache, cache, twist_key, self.make_twist_spline, twist_data)
+            new_verts, new_edges, new_faces = self.make_bevel(curve, bevel_verts, bevel_edges, bevel_faces, taper, twist, steps)
             out_vertices.append(new_verts)
             out_edges.append(new_edges)
             out_faces.append(new_faces)
-            mesh.free()
 
         self.outputs['Vertices'].sv_set(out_vertices)
         self.outputs['Edges'].sv_set(out_edges)
         self.outputs['Faces'].sv_set(out_faces)
+        # re-insert to keep the most recently updated nodes last
+        self.splines_cache.pop(self.node_id, None)
+        if cache:
+            self.splines_cache[self.node_id] = cache
+            # node ids are not saved, so entries of nodes from
+            # previously loaded files would otherwise stay forever
+            while len(self.splines_cache) > self.max_cached_nodes:
+                del self.splines_cache[next(iter(self.splines_cache))]
+
+    def sv_free(self):
+        self.splines_cache.pop(self.node_id, None)
 
 def register():
     bpy.utils.register_class(SvBevelCurveNode)
@@ -132,20 +132,16 @@ class SvBendAlongPathNode(SverchCustomTreeNode, bpy.types.Node):
         y = Vector((0.0, 1.0, 0.0))
         z = Vector((0.0, 0.0, 1.0))
 
-        if self.orient_axis == 0:
-            ax1, ax2, ax3 = x, y, z
-        elif self.orient_axis == 1:
-            ax1, ax2, ax3 = y, x, z
-        else:
-            ax1, ax2, ax3 = z, x, y
+        ax1 = (x, y, z)[self.orient_axis]
 
         if self.scale_all:
-            scale_matrix = Matrix.Scale(1/scale, 4, ax1) @ Matrix.Scale(scale, 4, ax2) @ Matrix.Scale(scale, 4, ax3)
+            scale_matrix = Matrix.Diagonal((scale, scale, scale, 1))
+            scale_matrix[self.orient_axis][self.orient_axis] = 1/scale
         else:
             scale_matrix = Matrix.Identity(4)
 
         if self.algorithm == 'householder':
-            rot = autorotate_householder(ax1, tangent).inverted()
+            rot = autorotate_householder(ax1, tangent).transposed()
         elif self.algorithm == 'track':
             rot = autorotate_track(self.orient_axis_, tangent, self.up_axis)
         elif self.algorithm == 'diff':
@@ -189,8 +185,8 @@ class SvBendAlongPathNode(SverchCustomTreeNode, bpy.types.Node):
             scale = spline.length(t_values) / object_size
             # These are points lying on the spline
             # (a projection of object to spline)
-            spline_vertices = [Vector(v) for v in spline.eval(t_values).tolist()]
-            spline_tangents = [Vector(v) for v in spline.tangent(t_values, h=self.tangent_precision).tolist()]
+            spline_vertices = [Vector(v) for v in spline.eval(t_values)]
+            spline_tangents = [Vector(v) for v in spline.tangent(t_values, h=self.tangent_precision)]
 
             new_vertices = []
             for src_vertex, spline_vertex, spline_tangent in zip(vertices, spline_vertices, spline_tangents):
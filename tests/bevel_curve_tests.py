@@ -0,0 +1,276 @@
+
+from unittest.mock import patch
+
+import numpy as np
+from mathutils import Vector, Matrix
+
+from sverchok.utils.testing import *
+from sverchok.utils.geom import autorotate_householder, autorotate_track, autorotate_diff
+from sverchok.dependencies import numba
+import sverchok.nodes.modifier_make.bevel_curve as bevel_curve
+
+# Per-step mathutils implementation of SvBevelCurveNode, as it was
+# before vectorization; used as the reference for vertex positions.
+
+def reference_matrix(node, tangent, twist_value, scale_x, scale_y):
+    x = Vector((1.0, 0.0, 0.0))
+    y = Vector((0.0, 1.0, 0.0))
+    z = Vector((0.0, 0.0, 1.0))
+
+    if node.orient_axis_idx == 0:
+        ax1, ax2, ax3 = x, y, z
+    elif node.orient_axis_idx == 1:
+        ax1, ax2, ax3 = y, x, z
+    else:
+        ax1, ax2, ax3 = z, x, y
+
+    scale_matrix = Matrix.Scale(1, 4, ax1) @ Matrix.Scale(scale_x, 4, ax2) @ Matrix.Scale(scale_y, 4, ax3)
+    twist_matrix = Matrix.Rotation(twist_value, 4, ax1)
+
+    if node.algorithm == 'householder':
+        rot = autorotate_householder(ax1, tangent).inverted()
+    elif node.algorithm == 'track':
+        rot = autorotate_track(node.orient_axis, tangent, node.up_axis)
+    else:
+        rot = autorotate_diff(tangent, ax1)
+
+    return rot @ scale_matrix @ twist_matrix
+
+def reference_taper_scale(node, vertex):
+    projection = Vector(vertex)
+    if node.separate_scale:
+        return abs(projection[(node.orient_axis_idx + 1) % 3]), abs(projection[(node.orient_axis_idx - 1) % 3])
+    else:
+        projection[node.orient_axis_idx] = 0
+        return projection.length, projection.length
+
+def reference_vertices(node, curve, bevel_verts, taper, twist, steps):
+    spline = node.build_spline(curve, node.bevel_mode, node.is_cyclic)
+    t_values = np.linspace(0.0, 1.0, num=steps)
+    if node.is_cyclic:
+        t_values = t_values[:-1]
+
+    spline_vertices = [Vector(v) for v in spline.eval(t_values).tolist()]
+    spline_tangents = [Vector(v) for v in spline.tangent(t_values, h=node.tangent_precision).tolist()]
+    taper_values = [reference_taper_scale(node, v) for v in taper.eval(t_values).tolist()]
+    twist_values = [v[0] for v in twist.eval(t_values).tolist()]
+
+    vertices = []
+    for spline_vertex, spline_tangent, (scale_x, scale_y), twist_value in zip(spline_vertices, spline_tangents, taper_values, twist_values):
+        matrix = reference_matrix(node, spline_tangent, twist_value, scale_x, scale_y)
+        for bevel_vertex in bevel_verts:
+            vertices.append(tuple(matrix @ Vector(bevel_vertex) + spline_vertex))
+    return vertices
+
+def reference_faces(n_steps, n_bevel, bevel_edges, bevel_faces, cap_start, cap_end, is_cyclic):
+    # Faces in the order the bmesh-based implementation created them
+    levels = [list(range(s * n_bevel, (s + 1) * n_bevel)) for s in range(n_steps)]
+    faces = []
+    for prev, level in zip(levels, levels[1:]):
+        for i, j in bevel_edges:
+            faces.append([prev[j], level[j], level[i], prev[i]])
+    first, last = levels[0], levels[-1]
+    if not is_cyclic:
+        if cap_start:
+            if not bevel_faces:
+                faces.append(list(reversed(first)))
+            else:
+                faces.extend([[first[i] for i in reversed(face)] for face in bevel_faces])
+        if cap_end:
+            if not bevel_faces:
+                faces.append(last)
+            else:
+                faces.extend([[last[i] for i in face] for face in bevel_faces])
+    else:
+        for i, j in bevel_edges:
+            faces.append([first[i], last[i], last[j], first[j]])
+    return faces
+
+def reference_edges(faces):
+    # Unique edges of faces, sorted as make_bevel outputs them
+    edges = set()
+    for face in faces:
+        for i, j in zip(face, face[1:] + face[:1]):
+            edges.add((min(i, j), max(i, j)))
+    return [list(edge) for edge in sorted(edges)]
+
+class BevelCurveTests(NodeProcessTestCase):
+    node_bl_idname = "SvBevelCurveNode"
+
+    curve = [(0.0, 0.0, 0.0), (1.0, 0.5, 0.2), (2.0, 0.0, 1.0), (2.5, -1.0, 2.0), (3.0, -0.5, 3.5)]
+    bevel_verts = [(0.3, 0.1, 0.0), (-0.2, 0.4, 0.1), (-0.1, -0.3, 0.2), (0.25, -0.2, -0.1)]
+    bevel_edges = [(0, 1), (1, 2), (2, 3), (3, 0)]
+    twist_data = [0.0, 0.7, 1.5]
+    steps = 12
+
+    def taper_verts(self, axis_idx):
+        verts = []
+        for k in range(4):
+            vertex = [0.0, 0.0, 0.0]
+            vertex[axis_idx] = k / 3.0
+            vertex[(axis_idx + 1) % 3] = 1.0 + 0.5 * k
+            vertex[(axis_idx - 1) % 3] = 0.7 - 0.2 * k
+            verts.append(tuple(vertex))
+        return verts
+
+    def make_bevel(self, bevel_faces=None):
+        node = self.node
+        taper = node.make_taper_spline(self.taper_verts(node.orient_axis_idx))
+        twist = node.make_twist_spline(self.twist_data)
+        return node.make_bevel(self.curve, self.bevel_verts, self.bevel_edges, bevel_faces or [], taper, twist, self.steps)
+
+    def check_vertices(self):
+        node = self.node
+        taper = node.make_taper_spline(self.taper_verts(node.orient_axis_idx))
+        twist = node.make_twist_spline(self.twist_data)
+        expected = reference_vertices(node, self.curve, self.bevel_verts, taper, twist, self.steps)
+        vertices = self.make_bevel()[0]
+        np.testing.assert_allclose(np.array(vertices), np.array(expected), atol=1e-5)
+
+    def test_vertices(self):
+        for orient_axis in 'XYZ':
+            for algorithm in ['householder', 'track', 'diff']:
+                for separate_scale in [False, True]:
+                    with self.subTest(orient_axis=orient_axis, algorithm=algorithm, separate_scale=separate_scale):
+                        self.node.orient_axis = orient_axis
+                        self.node.up_axis = 'Z' if orient_axis != 'Z' else 'X'
+                        self.node.algorithm = algorithm
+                        self.node.separate_scale = separate_scale
+                        self.check_vertices()
+
+    def test_vertices_householder_numpy(self):
+        # the same as above, without numba kernel even if numba is available
+        self.node.algorithm = 'householder'
+        with patch.object(bevel_curve, 'numba', None):
+            for orient_axis in 'XYZ':
+                for separate_scale in [False, True]:
+                    with self.subTest(orient_axis=orient_axis, separate_scale=separate_scale):
+                        self.node.orient_axis = orient_axis
+                        self.node.separate_scale = separate_scale
+                        self.check_vertices()
+
+    def check_topology(self, bevel_faces=None):
+        node = self.node
+        n_bevel = len(self.bevel_verts)
+        n_steps = self.steps - 1 if node.is_cyclic else self.steps
+        vertices, edges, faces = self.make_bevel(bevel_faces)
+        expected_faces = reference_faces(n_steps, n_bevel, self.bevel_edges, bevel_faces,
+                                         node.cap_start, node.cap_end, node.is_cyclic)
+        self.assertEqual(len(vertices), n_steps * n_bevel)
+        self.assertEqual(faces, expected_faces)
+        self.assertEqual(edges, reference_edges(expected_faces))
+
+    def test_topology_open(self):
+        self.check_topology()
+
+    def test_topology_capped(self):
+        self.node.cap_start = True
+        self.node.cap_end = True
+        with self.subTest(bevel_faces=False):
+            self.check_topology()
+        with self.subTest(bevel_faces=True):
+            self.check_topology([[0, 1, 2], [0, 2, 3]])
+
+    def test_topology_cyclic(self):
+        self.node.is_cyclic = True
+        # caps are ignored for cyclic curves
+        self.node.cap_start = True
+        self.check_topology()
+
+    def test_no_steps(self):
+        # Steps = 0, or a cyclic curve with Steps = 1, give an empty mesh
+        for is_cyclic, steps in [(False, 0), (True, 0), (True, 1)]:
+            for algorithm in ['householder', 'track', 'diff']:
+                for bevel_mode in ['SPL', 'LIN']:
+                    with self.subTest(is_cyclic=is_cyclic, steps=steps, algorithm=algorithm, bevel_mode=bevel_mode):
+                        self.node.is_cyclic = is_cyclic
+                        self.node.algorithm = algorithm
+                        self.node.bevel_mode = bevel_mode
+                        self.node.cap_start = True
+                        taper = self.node.make_taper_spline(self.taper_verts(self.node.orient_axis_idx))
+                        twist = self.node.make_twist_spline(self.twist_data)
+                        result = self.node.make_bevel(self.curve, self.bevel_verts, self.bevel_edges, [], taper, twist, steps)
+                        self.assertEqual(result, ([], [], []))
+
+    @requires(numba)
+    def test_householder_kernel(self):
+        self.node.algorithm = 'householder'
+        tangents = np.array([(1.0, 0.2, -0.3), (0.0, 0.0, -2.0), (0.5, -1.5, 0.7), (0.0, 0.0, 0.0)])
+        twist_values = np.array([0.0, 0.3, -1.2, 2.0])
+        taper_values = np.array([(1.0, 1.0), (0.5, 2.0), (1.5, 0.3), (1.0, 0.7)])
+        for orient_axis in 'XYZ':
+            with self.subTest(orient_axis=orient_axis):
+                self.node.orient_axis = orient_axis
+                with patch.object(bevel_curve, 'numba', None):
+                    expected = self.node.get_matrices(tangents, twist_values, taper_values)
+                matrices = bevel_curve.bevel_householder_matrices(self.node.orient_axis_idx, tangents, twist_values, taper_values)
+                np.testing.assert_allclose(matrices, expected, atol=1e-12)
+
+class BevelCurveCacheTests(NodeProcessTestCase):
+    node_bl_idname = "SvBevelCurveNode"
+    connect_output_sockets = ["Vertices"]
+
+    taper_verts = [(1.0, 0.7, 0.0), (1.5, 0.5, 0.3), (2.0, 0.3, 0.7), (2.5, 0.1, 1.0)]
+
+    def setUp(self):
+        super().setUp()
+        # inputs must be linked for sv_set data to be seen by the node
+        ngon = create_node("SvNGonNode")
+        for input_name in ['Curve', 'BevelVerts', 'TaperVerts']:
+            self.tree.links.new(ngon.outputs['Vertices'], self.node.inputs[input_name])
+        for input_name in ['BevelEdges', 'Twist']:
+            self.tree.links.new(ngon.outputs['Edges'], self.node.inputs[input_name])
+
+    def process(self, taper_verts, twist_data):
+        self.node.inputs['Curve'].sv_set([BevelCurveTests.curve])
+        self.node.inputs['BevelVerts'].sv_set([BevelCurveTests.bevel_verts])
+        self.node.inputs['BevelEdges'].sv_set([BevelCurveTests.bevel_edges])
+        self.node.inputs['TaperVerts'].sv_set([taper_verts])
+        self.node.inputs['Twist'].sv_set([twist_data])
+        self.node.process()
+
+    def process_numpy(self):
+        self.process(np.array(self.taper_verts), np.array(BevelCurveTests.twist_data))
+
+    def get_cached_spline(self, kind):
+        cache = self.node.splines_cache.get(self.node.node_id, {})
+        splines = [spline for key, spline in cache.items() if key[0] == kind]
+        self.assertEqual(len(splines), 1)
+        return splines[0]
+
+    def test_cache_reused(self):
+        self.process_numpy()
+        taper = self.get_cached_spline('TAPER')
+        twist = self.get_cached_spline('TWIST')
+        self.process_numpy()
+        self.assertIs(self.get_cached_spline('TAPER'), taper)
+        self.assertIs(self.get_cached_spline('TWIST'), twist)
+
+    def test_cache_rebuilt_on_property_change(self):
+        # property, new value, kinds of splines that depend on it
+        changes = [('taper_mode', 'LIN', {'TAPER'}),
+                   ('taper_metric', 'SAME', {'TAPER'}),
+                   ('orient_axis', 'X', {'TAPER'}),
+                   ('twist_mode', 'SPL', {'TWIST'}),
+                   ('is_cyclic', True, {'TWIST'}),
+                   ('metric', 'MANHATTAN', {'TAPER', 'TWIST'})]
+        for prop, value, rebuilt in changes:
+            with self.subTest(prop=prop):
+                self.process_numpy()
+                old = {kind: self.get_cached_spline(kind) for kind in ['TAPER', 'TWIST']}
+                old_value = getattr(self.node, prop)
+                setattr(self.node, prop, value)
+                try:
+                    self.process_numpy()
+                    for kind, spline in old.items():
+                        if kind in rebuilt:
+                            self.assertIsNot(self.get_cached_spline(kind), spline, kind)
+                        else:
+                            self.assertIs(self.get_cached_spline(kind), spline, kind)
+                finally:
+                    setattr(self.node, prop, old_value)
+
+    def test_list_input_not_cached(self):
+        self.process_numpy()
+        self.process(self.taper_verts, BevelCurveTests.twist_data)
+        self.assertNotIn(self.node.node_id, self.node.splines_cache)
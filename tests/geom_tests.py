@@ -171,3 +171,10 @@ class GeometryTests(SverchokTestCase):
 
         self.assertTrue(r is None)
 
+
+    def test_autorotate_householder_involution(self):
+        e1 = Vector((0, 0, 1))
+        tangent = Vector((0.3, -1.2, 0.5))
+        rot = autorotate_householder(e1, tangent)
+        self.assert_numpy_arrays_equal(np.array(rot.transposed()), np.array(rot.inverted()), precision=5)
+        self.assert_numpy_arrays_equal(np.array(rot.transposed()), np.array(rot))
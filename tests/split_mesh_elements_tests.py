@@ -0,0 +1,89 @@
+
+import random
+from itertools import chain
+
+import numpy as np
+
+from sverchok.utils.testing import *
+from sverchok.nodes.modifier_change.split_mesh_elements import (
+    remap_split_verts, remap_split_verts_np, split_mesh_elements_node)
+
+def reference_remap(faces, selected):
+    # Dictionary-based remapping, as split_by_vertices did it before vectorization
+    new_faces = []
+    old_v_indexes = []
+    old_new_verts = dict()
+    for face in faces:
+        new_face = []
+        for i in face:
+            if selected[i]:
+                old_v_indexes.append(i)
+                new_face.append(len(old_v_indexes) - 1)
+            else:
+                if i in old_new_verts:
+                    new_face.append(old_new_verts[i])
+                else:
+                    old_v_indexes.append(i)
+                    old_new_verts[i] = len(old_v_indexes) - 1
+                    new_face.append(len(old_v_indexes) - 1)
+        new_faces.append(new_face)
+    return list(chain.from_iterable(new_faces)), old_v_indexes
+
+class SplitByVerticesRemapTests(SverchokTestCase):
+
+    def make_mesh(self, seed, ragged):
+        rnd = random.Random(seed)
+        n_verts = rnd.randint(4, 40)
+        sizes = [rnd.randint(3, 6) if ragged else 4 for _ in range(rnd.randint(1, 30))]
+        faces = [rnd.sample(range(n_verts), size) for size in sizes]
+        selected = [rnd.random() < 0.5 for _ in range(n_verts)]
+        return n_verts, faces, selected
+
+    def check_remap(self, n_verts, faces, selected):
+        face_verts = np.array(list(chain.from_iterable(faces)), dtype=np.int32)
+        selected_np = np.array(selected, dtype=bool)
+        expected_faces, expected_indexes = reference_remap(faces, selected)
+        for remap in [remap_split_verts_np, remap_split_verts]:
+            with self.subTest(remap=remap.__name__):
+                new_face_verts, old_v_indexes = remap(face_verts, selected_np, n_verts)
+                self.assertEqual(new_face_verts.tolist(), expected_faces)
+                self.assertEqual(old_v_indexes.tolist(), expected_indexes)
+
+    def test_remap_uniform(self):
+        for seed in range(20):
+            self.check_remap(*self.make_mesh(seed, ragged=False))
+
+    def test_remap_ragged(self):
+        for seed in range(20):
+            self.check_remap(*self.make_mesh(seed, ragged=True))
+
+    def test_remap_all_selected(self):
+        faces = [[0, 1, 2], [0, 2, 3]]
+        self.check_remap(4, faces, [True] * 4)
+
+    def test_remap_none_selected(self):
+        faces = [[0, 1, 2], [0, 2, 3]]
+        self.check_remap(4, faces, [False] * 4)
+
+class SplitMeshElementsTests(SverchokTestCase):
+    verts = [(0, 0, 0), (1, 0, 0), (1, 1, 0), (0, 1, 0), (2, 0, 0), (2, 1, 0)]
+    faces = [[0, 1, 2, 3], [1, 4, 5, 2]]
+    mask = [False, True, True, False, False, False]
+
+    def test_split_lists(self):
+        verts, edges, faces, _ = split_mesh_elements_node(self.verts, [], self.faces, mask=self.mask)
+        self.assertIsInstance(verts, list)
+        self.assertIsInstance(edges, list)
+        self.assertEqual(len(verts), 8)
+        self.assertEqual(faces, [[0, 1, 2, 3], [4, 5, 6, 7]])
+
+    def test_split_twice_numpy(self):
+        verts, edges, faces, _ = split_mesh_elements_node(
+            self.verts, [], self.faces, mask=self.mask, output_numpy=True)
+        self.assertIsInstance(verts, np.ndarray)
+        self.assertIsInstance(edges, np.ndarray)
+        self.assertEqual(faces.tolist(), [[0, 1, 2, 3], [4, 5, 6, 7]])
+        verts2, edges2, faces2, _ = split_mesh_elements_node(
+            verts, edges, faces, mask=[False] * len(verts), output_numpy=True)
+        self.assert_numpy_arrays_equal(verts2, verts)
+        self.assert_numpy_arrays_equal(faces2, faces)
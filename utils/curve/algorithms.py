@@ -212,22 +212,15 @@ class MathutilsRotationCalculator(object):
         y = Vector((0.0, 1.0, 0.0))
         z = Vector((0.0, 0.0, 1.0))
 
-        if axis == 0:
-            ax1, ax2, ax3 = x, y, z
-        elif axis == 1:
-            ax1, ax2, ax3 = y, x, z
-        else:
-            ax1, ax2, ax3 = z, x, y
+        ax1 = (x, y, z)[axis]
 
-        if scale_all:
-            scale_matrix = Matrix.Scale(1/scale, 4, ax1) @ Matrix.Scale(scale, 4, ax2) @ Matrix.Scale(scale, 4, ax3)
-        else:
-            scale_matrix = Matrix.Scale(1/scale, 4, ax1)
-        scale_matrix = np.array(scale_matrix.to_3x3())
+        scales = np.full(3, scale if scale_all else 1.0)
+        scales[axis] = 1/scale
+        scale_matrix = np.diag(scales)
 
         tangent = Vector(tangent)
         if algorithm == HOUSEHOLDER:
-            rot = autorotate_householder(ax1, tangent).inverted()
+            rot = autorotate_householder(ax1, tangent).transposed()
         elif algorithm == TRACK:
             axis = "XYZ"[axis]
             rot = autorotate_track(axis, tangent, up_axis)
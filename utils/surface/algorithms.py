@@ -676,7 +676,7 @@ class SvExtrudeCurveMathutilsSurface(SvSurface):
             ax1, ax2, ax3 = z, x, y
 
         if self.algorithm == 'householder':
-            rot = autorotate_householder(ax1, tangent).inverted()
+            rot = autorotate_householder(ax1, tangent).transposed()
         elif self.algorithm == 'track':
             rot = autorotate_track(self.orient_axis, tangent, self.up_axis)
         elif self.algorithm == 'diff':